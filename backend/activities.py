@@ -1,5 +1,8 @@
+import asyncio
 import os
+from typing import List, Optional, Tuple
 from temporalio import activity
+from temporalio.client import Client as TemporalClient
 from minio import Minio
 import whisper
 import torch
@@ -14,12 +17,22 @@ from collections import Counter
 
 from database import engine
 from models import MediaRecord
+from compression import compress_text
+from model_store import load_whisper_shared
+from segments import SegmentBuffer, delete_segments, format_segment, load_segments
 from config import (
     MINIO_ENDPOINT,
     MINIO_ACCESS_KEY,
     MINIO_SECRET_KEY,
     MEDIA_BUCKET,
-    SUMMARIZER_URL
+    SUMMARIZER_URL,
+    TRANSCRIPT_ZSTD_LEVEL,
+    WHISPER_MODEL,
+    WHISPER_MMAP_WEIGHTS,
+    WHISPER_WEIGHTS_DIR,
+    TRANSCRIBE_CHUNK_SECONDS,
+    SEGMENT_FLUSH_SIZE,
+    SEGMENT_FLUSH_INTERVAL_SECONDS,
 )
 
 
@@ -32,6 +45,9 @@ storage_client = Minio(
 
 _whisper_model = None
 
+# Well inside the transcribe activity's heartbeat timeout
+HEARTBEAT_INTERVAL_SECONDS = 30
+
 def get_whisper_model():
     global _whisper_model
 
@@ -42,10 +58,17 @@ def get_whisper_model():
             f"Loading Whisper model on device={device}"
         )
 
-        _whisper_model = whisper.load_model(
-            "medium",
-            device=device,
-        )
+        if WHISPER_MMAP_WEIGHTS and device == "cpu":
+            # Weights are mapped from disk and shared with other worker processes
+            _whisper_model = load_whisper_shared(
+                WHISPER_MODEL,
+                WHISPER_WEIGHTS_DIR,
+            )
+        else:
+            _whisper_model = whisper.load_model(
+                WHISPER_MODEL,
+                device=device,
+            )
 
     return _whisper_model
 
@@ -78,6 +101,10 @@ def is_coherent_transcript(text: str) -> bool:
 
 
 class MediaActivities:
+    def __init__(self, client: Optional[TemporalClient] = None):
+        # Used to push live transcript segments to the running workflow
+        self.client = client
+
     @activity.defn
     async def download_from_minio(self, s3_key: str) -> str:
         """
@@ -131,30 +158,65 @@ class MediaActivities:
     @activity.defn
     async def transcribe_audio(self, data: dict) -> dict:
         """
-        Transcribes the audio and deletes all temporary files.
+        Transcribes the audio chunk by chunk, flushing segments to the
+        segment store as it goes, and deletes all temporary files.
         """
         print("Transcribing the audio")
         
         input_path = data["input_path"]
         clean_path = data["clean_path"]
+        # Missing for jobs scheduled before live segments: skip the segment store
+        file_id = data.get("file_id")
 
         model = get_whisper_model()
 
+        # Resume from the last flushed chunk after a retry
+        offset, next_seq = 0.0, 0
+        details = activity.info().heartbeat_details
+        if details and file_id:
+            offset, next_seq = details[0]["offset"], details[0]["seq"]
+
+        flushed = {"offset": offset, "seq": next_seq}
+
         activity.logger.info(f"Transcribing {clean_path}")
 
-        result = model.transcribe(
-            clean_path,
-            language="en",
-            fp16=False,
-            condition_on_previous_text=False,
+        audio = await asyncio.to_thread(whisper.load_audio, clean_path)
+        duration = len(audio) / whisper.audio.SAMPLE_RATE
+
+        segments = []
+        if file_id:
+            segments = await asyncio.to_thread(self._restore_segments, file_id, next_seq)
+        buffer = SegmentBuffer(
+            file_id,
+            next_seq,
+            flush_size=SEGMENT_FLUSH_SIZE,
+            flush_interval=SEGMENT_FLUSH_INTERVAL_SECONDS,
         )
-
-        transcript = ""
-        for seg in result["segments"]:
-            transcript += (
-                f"[{seg['start']:7.2f} → {seg['end']:7.2f}] "
-                f"{seg['text']}\n"
+        # Segments restored after a retry may not have reached the workflow yet
+        unsignalled: List[dict] = list(segments)
+
+        while offset < duration:
+            chunk, offset = await self._heartbeating(
+                asyncio.to_thread(
+                    self._transcribe_chunk, model, audio, offset, TRANSCRIBE_CHUNK_SECONDS
+                ),
+                flushed,
             )
+            segments.extend(chunk)
+
+            if file_id:
+                for seg in chunk:
+                    buffer.add(seg)
+                if buffer.should_flush() or offset >= duration:
+                    unsignalled = await self._flush_segments(buffer, unsignalled)
+                    flushed = {"offset": offset, "seq": buffer.next_seq}
+
+            # Heartbeat every chunk (even silent ones) with the last flushed position
+            activity.heartbeat(flushed)
+            # Keep the temp dir fresh so retention never removes it mid-job
+            os.utime(os.path.dirname(clean_path))
+
+        transcript = "".join(format_segment(seg) for seg in segments)
 
         # ✅ cleanup ONLY after success
         print("Deleting files")
@@ -167,9 +229,90 @@ class MediaActivities:
 
         return {
                 "transcript" : transcript,
-                "text" : result["text"]
+                "text" : "".join(seg["text"] for seg in segments)
             }
 
+    async def _heartbeating(self, awaitable, details: dict):
+        """Awaits `awaitable`, heartbeating meanwhile: a chunk can outlast the timeout."""
+        task = asyncio.ensure_future(awaitable)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=HEARTBEAT_INTERVAL_SECONDS)
+                if done:
+                    return task.result()
+                activity.heartbeat(details)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+    def _transcribe_chunk(
+        self, model, audio, start: float, chunk_seconds: float
+    ) -> Tuple[List[dict], float]:
+        """
+        Transcribes up to `chunk_seconds` of audio from `start` (seconds).
+        Returns the segments with absolute timestamps and where the next
+        chunk starts.
+        """
+        sample_rate = whisper.audio.SAMPLE_RATE
+        duration = len(audio) / sample_rate
+        end = min(start + chunk_seconds, duration)
+
+        result = model.transcribe(
+            audio[int(start * sample_rate):int(end * sample_rate)],
+            language="en",
+            fp16=False,
+            condition_on_previous_text=False,
+        )
+        chunk = [
+            {
+                "start": start + seg["start"],
+                "end": start + seg["end"],
+                "text": seg["text"],
+            }
+            for seg in result["segments"]
+        ]
+
+        # The last segment may be cut at the chunk boundary,
+        # so it is transcribed again as part of the next chunk
+        if end < duration and len(chunk) > 1 and chunk[-1]["start"] > start:
+            return chunk[:-1], chunk[-1]["start"]
+        return chunk, end
+
+    def _restore_segments(self, file_id: str, next_seq: int) -> List[dict]:
+        """
+        Returns the segments flushed before a retry and drops any that were
+        written after the last heartbeat (they get transcribed again).
+        """
+        with Session(engine) as session:
+            delete_segments(session, [file_id], since=next_seq)
+            session.commit()
+
+        if not next_seq:
+            return []
+        return load_segments(file_id, since=0, limit=next_seq)
+
+    async def _flush_segments(
+        self, buffer: SegmentBuffer, unsignalled: List[dict]
+    ) -> List[dict]:
+        """
+        Writes the buffered segments and signals them, with any earlier
+        batch whose signal failed, to the workflow. Returns the segments
+        still to be signalled.
+        """
+        batch = unsignalled + await asyncio.to_thread(buffer.flush)
+        if not batch or not self.client:
+            return []
+
+        # Best effort: the segment store stays the source of truth
+        try:
+            handle = self.client.get_workflow_handle(activity.info().workflow_id)
+            await handle.signal("segments_flushed", batch)
+        except Exception as err:
+            activity.logger.warning(f"Could not signal segments, resending with the next batch: {err}")
+            return batch
+
+        return []
+
 
 
     @activity.defn
@@ -221,12 +364,20 @@ class MediaActivities:
                 )
                 return
 
-            record.transcript = data["transcript"]
+            # Nothing is stored for an empty transcript (silent audio), so
+            # downloads keep reporting it as empty instead of serving a blank file
+            record.transcript_zst = (
+                compress_text(data["transcript"], level=TRANSCRIPT_ZSTD_LEVEL)
+                if data["transcript"]
+                else None
+            )
             record.summary = data["summary"]
             record.status = data["status"]
             record.tokens = len(data["transcript"].split())
 
             session.add(record)
+            # The live segments are now covered by the stored transcript
+            delete_segments(session, [record.id])
             session.commit()
 
     @activity.defn
@@ -0,0 +1,426 @@
+"""
+Load-tests the backend API in-process, without Temporal, MinIO or Postgres.
+
+main.app runs with a fake Temporal client (jobs "complete" after
+--job-seconds), an in-memory S3 stand-in and a seeded SQLite database.
+Virtual users drive a weighted mix of multi-file uploads, history
+paging and result/download fetches, once per --concurrency level.
+The JSON report holds throughput, latency percentiles, event-loop lag
+and memory over time. Compare it with an earlier run via --baseline.
+
+The load generator shares the event loop with the app, so absolute
+numbers include client overhead: compare runs made on the same machine.
+
+Run from the backend directory:
+
+    python -m benchmarks.api_load --concurrency 1,4,16 --out report.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import httpx
+
+
+# -----------------------------
+# Stand-ins for external services
+# -----------------------------
+class FakeStorage:
+    """In-memory replacement for the Minio client calls the API makes."""
+
+    def __init__(self):
+        self.objects: Dict[str, bytes] = {}
+
+    def bucket_exists(self, bucket: str) -> bool:
+        return True
+
+    def make_bucket(self, bucket: str) -> None:
+        pass
+
+    def put_object(self, bucket, key, data, length, content_type=None):
+        self.objects[key] = data.read(length)
+
+    def remove_objects(self, bucket, delete_objects):
+        for obj in delete_objects:
+            self.objects.pop(obj.name, None)
+        return iter([])
+
+
+class FakeWorkflowHandle:
+    def __init__(self, workflow_id: str):
+        self.id = workflow_id
+
+    async def signal(self, *args, **kwargs) -> None:
+        pass
+
+    async def cancel(self) -> None:
+        pass
+
+
+class FakeTemporalClient:
+    """Accepts workflows and marks their job COMPLETED after a delay."""
+
+    def __init__(self, job_seconds: float, complete_job):
+        self.job_seconds = job_seconds
+        self.complete_job = complete_job
+        self.started = 0
+        self.completed = 0
+        self.tasks = set()
+
+    async def start_workflow(self, workflow, args, id, task_queue):
+        self.started += 1
+        task = asyncio.create_task(self._run(args[1]))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return FakeWorkflowHandle(id)
+
+    def get_workflow_handle(self, workflow_id: str) -> FakeWorkflowHandle:
+        return FakeWorkflowHandle(workflow_id)
+
+    async def _run(self, file_id: str) -> None:
+        await asyncio.sleep(self.job_seconds)
+        await asyncio.to_thread(self.complete_job, file_id)
+        self.completed += 1
+
+
+# -----------------------------
+# Measurement helpers
+# -----------------------------
+def rss_mib() -> float:
+    try:
+        with open("/proc/self/statm") as fp:
+            pages = int(fp.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak RSS only, but better than nothing off Linux
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / 1024 if sys.platform != "darwin" else usage / 2**20
+
+
+def percentiles(values: List[float]) -> dict:
+    if not values:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+
+    values = sorted(values)
+
+    def pick(pct: float) -> float:
+        return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+    return {
+        "p50": round(pick(50), 2),
+        "p90": round(pick(90), 2),
+        "p99": round(pick(99), 2),
+        "max": round(values[-1], 2),
+    }
+
+
+class Monitor:
+    """Samples event-loop lag and memory while a stage runs."""
+
+    def __init__(self, tick: float = 0.05, sample_every: float = 1.0):
+        self.tick = tick
+        self.sample_every = sample_every
+        self.lags_ms: List[float] = []
+        self.timeline: List[dict] = []
+        self.requests = 0
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        window_lags: List[float] = []
+        next_sample = started + self.sample_every
+
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(self.tick)
+            lag = (time.perf_counter() - before - self.tick) * 1000
+            self.lags_ms.append(lag)
+            window_lags.append(lag)
+
+            now = time.perf_counter()
+            if now >= next_sample:
+                self.timeline.append({
+                    "t_s": round(now - started, 1),
+                    "rss_mib": round(rss_mib(), 1),
+                    "loop_lag_ms_max": round(max(window_lags), 2),
+                    "requests": self.requests,
+                })
+                window_lags = []
+                next_sample += self.sample_every
+
+
+# -----------------------------
+# Load generation
+# -----------------------------
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+async def virtual_user(client, args, weights, seeded_ids, stats, monitor, deadline, rng):
+    ops = list(weights)
+    op_weights = [weights[op] for op in ops]
+    payload = os.urandom(args.file_kb * 1024)
+    headers = {"Accept-Encoding": args.accept_encoding}
+
+    while time.perf_counter() < deadline:
+        op = rng.choices(ops, op_weights)[0]
+
+        if op == "upload":
+            files = [
+                ("files", (f"load-{rng.random():.8f}.mp3", payload, "audio/mpeg"))
+                for _ in range(args.files_per_upload)
+            ]
+            request = client.post("/process-media", files=files)
+        elif op == "history":
+            offset = rng.randrange(0, max(1, args.seed_records - args.page_size))
+            request = client.get(
+                "/history", params={"limit": args.page_size, "offset": offset}
+            )
+        elif op == "results":
+            request = client.get(f"/media/{rng.choice(seeded_ids)}/results", headers=headers)
+        elif op == "download":
+            request = client.get(
+                f"/media/{rng.choice(seeded_ids)}/transcript/download", headers=headers
+            )
+        else:
+            raise ValueError(f"Unknown operation: {op}")
+
+        start = time.perf_counter()
+        try:
+            response = await request
+            status = response.status_code
+        except Exception:
+            status = None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        monitor.requests += 1
+        if status == 429:
+            stats[op]["throttled"] += 1
+        elif status is None or status >= 400:
+            stats[op]["errors"] += 1
+        else:
+            stats[op]["latencies_ms"].append(elapsed_ms)
+
+
+async def run_stage(app, args, concurrency, weights, seeded_ids) -> dict:
+    stats = defaultdict(lambda: {"latencies_ms": [], "errors": 0, "throttled": 0})
+    monitor = Monitor()
+    monitor_task = asyncio.create_task(monitor.run())
+    rss_start = rss_mib()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            virtual_user(
+                client, args, weights, seeded_ids, stats, monitor, deadline,
+                random.Random(args.seed * 1000 + user),
+            )
+            for user in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    monitor_task.cancel()
+
+    ops = {}
+    for op, op_stats in sorted(stats.items()):
+        latencies = op_stats["latencies_ms"]
+        ops[op] = {
+            "ok": len(latencies),
+            "errors": op_stats["errors"],
+            "throttled": op_stats["throttled"],
+            "rps": round(len(latencies) / elapsed, 2),
+            "latency_ms": percentiles(latencies),
+        }
+
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "total_rps": round(sum(op["ok"] for op in ops.values()) / elapsed, 2),
+        "ops": ops,
+        "loop_lag_ms": percentiles(monitor.lags_ms),
+        "rss_mib": {
+            "start": round(rss_start, 1),
+            "end": round(rss_mib(), 1),
+            "max": round(max([rss_start] + [s["rss_mib"] for s in monitor.timeline]), 1),
+        },
+        "timeline": monitor.timeline,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Lists throughput drops and p99 increases beyond `tolerance`."""
+    regressions = []
+    base_stages = {stage["concurrency"]: stage for stage in baseline["stages"]}
+
+    for stage in report["stages"]:
+        base = base_stages.get(stage["concurrency"])
+        if not base:
+            continue
+
+        for op, current in stage["ops"].items():
+            previous = base["ops"].get(op)
+            if not previous:
+                continue
+
+            label = f"c={stage['concurrency']} {op}"
+            if current["rps"] < previous["rps"] * (1 - tolerance):
+                regressions.append(f"{label}: rps {previous['rps']} -> {current['rps']}")
+
+            p99, base_p99 = current["latency_ms"]["p99"], previous["latency_ms"]["p99"]
+            if p99 is not None and base_p99 and p99 > base_p99 * (1 + tolerance):
+                regressions.append(f"{label}: p99 {base_p99} ms -> {p99} ms")
+
+    return regressions
+
+
+# -----------------------------
+# Setup
+# -----------------------------
+def configure_environment(db_path: str) -> None:
+    """Points config at SQLite before any backend module is imported."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    for key in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+        os.environ.setdefault(key, "load")
+    # Measure the API, not the per-owner ingest quota (override to test it)
+    os.environ.setdefault("INGEST_BURST", "1000000000")
+    os.environ.setdefault("INGEST_RATE_PER_MINUTE", "1000000000")
+
+
+def seed_database(args, transcript_zst: bytes) -> List[str]:
+    from sqlmodel import Session
+    from models import MediaRecord
+    from database import engine
+
+    now = datetime.utcnow()
+    ids = []
+    with Session(engine) as session:
+        for i in range(args.seed_records):
+            record = MediaRecord(
+                filename=f"seed-{i}.mp3",
+                owner_id=f"seed-owner-{i % 10}",
+                s3_key=f"uploads/seed/{i}.mp3",
+                status="COMPLETED",
+                transcript_zst=transcript_zst,
+                summary="Seeded summary.",
+                tokens=1000,
+                created_at=now - timedelta(minutes=i),
+            )
+            session.add(record)
+            ids.append(record.id)
+        session.commit()
+    return ids
+
+
+def make_transcript(size_kb: int, rng: random.Random) -> str:
+    words = "the model turns speech into text one segment at a time".split()
+    lines, size, t = [], 0, 0.0
+    while size < size_kb * 1024:
+        line = f"[{t:7.2f} → {t + 4:7.2f}]  " + " ".join(rng.choices(words, k=12)) + ".\n"
+        lines.append(line)
+        size += len(line)
+        t += 4
+    return "".join(lines)
+
+
+async def run(args) -> dict:
+    from sqlmodel import Session
+    import main
+    from compression import compress_text
+    from database import engine, init_db
+    from models import MediaRecord
+
+    init_db()
+    transcript_zst = compress_text(make_transcript(args.transcript_kb, random.Random(args.seed)))
+    seeded_ids = seed_database(args, transcript_zst)
+
+    def complete_job(file_id: str) -> None:
+        with Session(engine) as session:
+            record = session.get(MediaRecord, file_id)
+            if record:
+                record.status = "COMPLETED"
+                record.transcript_zst = transcript_zst
+                session.add(record)
+                session.commit()
+
+    temporal = FakeTemporalClient(args.job_seconds, complete_job)
+    main.storage_client = FakeStorage()
+    main.temporal_state["client"] = temporal
+    dispatch_task = asyncio.create_task(main.dispatcher.run(temporal))
+
+    weights = parse_mix(args.mix)
+    stages = []
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        stage = await run_stage(main.app, args, concurrency, weights, seeded_ids)
+        stages.append(stage)
+        print(
+            f"c={concurrency:<4} {stage['total_rps']:>9} req/s  "
+            f"loop lag p99 {stage['loop_lag_ms']['p99']} ms  "
+            f"rss {stage['rss_mib']['end']} MiB",
+            file=sys.stderr,
+        )
+
+    dispatch_task.cancel()
+    for task in list(temporal.tasks):
+        task.cancel()
+
+    return {
+        "params": vars(args),
+        "stages": stages,
+        "workflows": {"started": temporal.started, "completed": temporal.completed},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", default="1,4,16", help="virtual users per stage")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per stage")
+    parser.add_argument("--mix", default="upload=1,history=4,results=4,download=1")
+    parser.add_argument("--files-per-upload", type=int, default=3)
+    parser.add_argument("--file-kb", type=int, default=256)
+    parser.add_argument("--seed-records", type=int, default=2000)
+    parser.add_argument("--transcript-kb", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--job-seconds", type=float, default=2.0)
+    parser.add_argument("--accept-encoding", default="gzip")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(os.path.join(tmp, "load.db"))
+        report = asyncio.run(run(args))
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as fp:
+            fp.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            regressions = compare(report, json.load(fp), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
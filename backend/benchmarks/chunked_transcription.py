@@ -0,0 +1,293 @@
+"""
+Compares the cost of one Whisper transcribe() call over the whole
+recording (the activity before live segments) with the chunked loop
+that flushes live segments, for several chunk lengths.
+
+Each chunk ends in a padded, partly empty 30 s window, and its last
+segment is decoded again with the next chunk, so short chunks pay for
+extra encoder passes. Two modes:
+
+- `--audio FILE`: transcribes a real recording each way with `--model`
+  and reports wall time (needs ffmpeg and the model weights).
+- otherwise: an estimate. Whisper's own transcribe() seek loop runs
+  against a stub decoder that replays a synthetic speech layout
+  (2-8 s segments with short pauses), counting encoder passes and
+  decoded tokens. Those are priced with the time of one encoder pass
+  and one decoder step of the `--model` architecture, measured here
+  with random weights (the cost does not depend on the values).
+
+Run from the backend directory:
+
+    python -m benchmarks.chunked_transcription [--audio FILE] [--model medium] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+import whisper
+from whisper.audio import HOP_LENGTH, N_FRAMES, SAMPLE_RATE
+from whisper.decoding import DecodingResult
+from whisper.model import ModelDimensions, Whisper
+from whisper.tokenizer import get_tokenizer
+
+TRANSCRIBE_MODULE = sys.modules["whisper.transcribe"]
+TIME_PRECISION = 0.02
+TOKENS_PER_SECOND = 3.0  # of speech, typical for English
+
+# Architecture of each model size, so the estimate needs no download
+DIMS = {
+    "tiny": dict(n_audio_state=384, n_audio_head=6, n_audio_layer=4, n_text_state=384, n_text_head=6, n_text_layer=4),
+    "base": dict(n_audio_state=512, n_audio_head=8, n_audio_layer=6, n_text_state=512, n_text_head=8, n_text_layer=6),
+    "small": dict(n_audio_state=768, n_audio_head=12, n_audio_layer=12, n_text_state=768, n_text_head=12, n_text_layer=12),
+    "medium": dict(n_audio_state=1024, n_audio_head=16, n_audio_layer=24, n_text_state=1024, n_text_head=16, n_text_layer=24),
+}
+
+
+def transcribe_chunked(model, audio, chunk_seconds: Optional[float]) -> List[dict]:
+    """The activity's loop (one plain call when chunk_seconds is None)."""
+    from activities import MediaActivities
+
+    if chunk_seconds is None:
+        chunk_seconds = len(audio) / SAMPLE_RATE
+
+    activities = MediaActivities()
+    duration = len(audio) / SAMPLE_RATE
+    offset, segments = 0.0, []
+    while offset < duration:
+        chunk, offset = activities._transcribe_chunk(model, audio, offset, chunk_seconds)
+        segments.extend(chunk)
+    return segments
+
+
+# -----------------------------
+# Estimate (stub decoder)
+# -----------------------------
+def make_layout(seconds: float, rng: random.Random) -> List[Tuple[float, float]]:
+    """Speech segments (start, end) covering the recording."""
+    layout, t = [], 0.0
+    while True:
+        end = t + rng.uniform(2.0, 8.0)
+        if end > seconds:
+            return layout
+        layout.append((t, end))
+        t = end + rng.uniform(0.1, 1.0)
+
+
+class StubModel:
+    """
+    Stands in for Whisper inside transcribe(): every decode() is one
+    encoder pass, and returns the timestamp tokens a model would emit
+    for the speech layout in that window.
+    """
+
+    def __init__(self, dims: ModelDimensions, layout: List[Tuple[float, float]]):
+        self.dims = dims
+        self.is_multilingual = dims.n_vocab >= 51865
+        self.num_languages = dims.n_vocab - 51765 - int(self.is_multilingual)
+        self.device = torch.device("cpu")
+        self.layout = layout
+        self.tokenizer = get_tokenizer(
+            self.is_multilingual, num_languages=self.num_languages, language="en"
+        )
+        self.word = self.tokenizer.encode(" word")[0]
+        self.passes = 0
+        self.tokens = 0
+
+    def _timestamp(self, seconds: float) -> int:
+        return self.tokenizer.timestamp_begin + round(seconds / TIME_PRECISION)
+
+    def decode(self, mel: torch.Tensor, options) -> DecodingResult:
+        # Row 0 carries the absolute time of each frame, row 1 marks real audio
+        window_start = float(mel[0, 0])
+        content_end = window_start + int(mel[1].sum()) * HOP_LENGTH / SAMPLE_RATE
+        padded = int(mel[1].sum()) < N_FRAMES
+
+        tokens = []
+        for start, end in self.layout:
+            if end <= window_start or start >= content_end:
+                continue
+            rel_start = max(start, window_start) - window_start
+            text = [self.word] * max(1, round((min(end, content_end) - max(start, window_start)) * TOKENS_PER_SECOND))
+            tokens += [self._timestamp(rel_start)] + text
+
+            if end <= content_end:
+                tokens.append(self._timestamp(end - window_start))
+            elif padded:
+                # The audio stops mid-segment: the model closes it where it stops
+                tokens.append(self._timestamp(content_end - window_start))
+            # else: left open, so transcribe() seeks back to its start
+
+        self.passes += 1
+        self.tokens += len(tokens)
+        return DecodingResult(
+            audio_features=None,
+            language="en",
+            tokens=tokens,
+            text="",
+            avg_logprob=-0.2,
+            no_speech_prob=0.0,
+            temperature=0.0,
+            compression_ratio=1.5,
+        )
+
+
+def stub_log_mel(audio, n_mels: int = 80, padding: int = 0, device=None) -> torch.Tensor:
+    """A 'spectrogram' whose frames say when they are (see StubModel)."""
+    audio = torch.as_tensor(audio)
+    frames = (len(audio) + padding) // HOP_LENGTH
+    content = len(audio) // HOP_LENGTH
+
+    mel = torch.zeros(n_mels, frames)
+    mel[0, :content] = audio[::HOP_LENGTH][:content]
+    mel[1, :content] = 1
+    return mel
+
+
+@contextmanager
+def stubbed_spectrogram():
+    original = TRANSCRIBE_MODULE.log_mel_spectrogram
+    TRANSCRIBE_MODULE.log_mel_spectrogram = stub_log_mel
+    try:
+        yield
+    finally:
+        TRANSCRIBE_MODULE.log_mel_spectrogram = original
+
+
+def count_work(dims: ModelDimensions, seconds: float, chunk_seconds: Optional[float], seed: int) -> dict:
+    layout = make_layout(seconds, random.Random(seed))
+    model = StubModel(dims, layout)
+
+    # Each sample holds its absolute time, so any slice still knows where it is
+    audio = np.arange(int(seconds * SAMPLE_RATE), dtype=np.float32) / SAMPLE_RATE
+    model.transcribe = lambda audio, **kwargs: whisper.transcribe(model, audio, **kwargs)
+
+    with stubbed_spectrogram():
+        segments = transcribe_chunked(model, audio, chunk_seconds)
+
+    return {
+        "passes": model.passes,
+        "tokens": model.tokens,
+        "segments": sum(1 for seg in segments if seg["text"]),
+    }
+
+
+def time_model(dims: ModelDimensions, repeats: int = 3) -> Tuple[float, float]:
+    """Seconds per encoder pass and per greedy decoder step."""
+    model = Whisper(dims).eval()
+    mel = torch.zeros(1, dims.n_mels, N_FRAMES)
+    tokens = torch.tensor([[50258, 50259, 50359]])
+
+    with torch.no_grad():
+        model.embed_audio(mel)  # warm-up
+        encoder = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            features = model.embed_audio(mel)
+            encoder.append(time.perf_counter() - start)
+
+        cache, hooks = model.install_kv_cache_hooks()
+        model.decoder(tokens, features, kv_cache=cache)
+        steps = 50
+        start = time.perf_counter()
+        for _ in range(steps):
+            model.decoder(tokens[:, -1:], features, kv_cache=cache)
+        step = (time.perf_counter() - start) / steps
+        for hook in hooks:
+            hook.remove()
+
+    return statistics.median(encoder), step
+
+
+def estimate(args, chunk_sizes: List[Optional[float]]) -> dict:
+    base = ModelDimensions(
+        n_mels=80, n_audio_ctx=1500, n_vocab=51865, n_text_ctx=448, **DIMS[args.model]
+    )
+    seconds = args.minutes * 60
+    encoder_s, step_s = time_model(base)
+
+    results = {}
+    for chunk_seconds in chunk_sizes:
+        work = count_work(base, seconds, chunk_seconds, args.seed)
+        work["estimated_s"] = round(work["passes"] * encoder_s + work["tokens"] * step_s, 1)
+        results[label(chunk_seconds)] = work
+
+    return {
+        "encoder_pass_s": round(encoder_s, 3),
+        "decoder_step_s": round(step_s, 4),
+        "results": results,
+    }
+
+
+# -----------------------------
+# Real recording
+# -----------------------------
+def measure(args, chunk_sizes: List[Optional[float]]) -> dict:
+    model = whisper.load_model(args.model, device="cpu")
+    audio = whisper.load_audio(args.audio)
+
+    passes = [0]
+    model.encoder.register_forward_hook(lambda *_: passes.__setitem__(0, passes[0] + 1))
+
+    results = {}
+    for chunk_seconds in chunk_sizes:
+        passes[0] = 0
+        start = time.perf_counter()
+        segments = transcribe_chunked(model, audio, chunk_seconds)
+        results[label(chunk_seconds)] = {
+            "passes": passes[0],
+            "segments": sum(1 for seg in segments if seg["text"]),
+            "wall_s": round(time.perf_counter() - start, 1),
+            "words": sum(len(seg["text"].split()) for seg in segments),
+        }
+
+    return {"audio_s": round(len(audio) / SAMPLE_RATE, 1), "results": results}
+
+
+def label(chunk_seconds: Optional[float]) -> str:
+    return "single" if chunk_seconds is None else f"chunk_{chunk_seconds:g}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--audio", help="real recording to transcribe")
+    parser.add_argument("--model", default="medium", choices=sorted(DIMS))
+    parser.add_argument("--minutes", type=float, default=120, help="estimate: recording length")
+    parser.add_argument("--chunks", default="30,120,300,600", help="chunk lengths in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args()
+
+    # activities imports config, which needs these (nothing connects)
+    for key in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+        os.environ.setdefault(key, "bench")
+
+    chunk_sizes = [None] + [float(c) for c in args.chunks.split(",")]
+    report = measure(args, chunk_sizes) if args.audio else estimate(args, chunk_sizes)
+
+    if args.json:
+        print(json.dumps({"params": vars(args), **report}, indent=2))
+        return
+
+    for key, value in report.items():
+        if key != "results":
+            print(f"{key}: {value}")
+
+    single = report["results"]["single"]
+    cost = "wall_s" if args.audio else "estimated_s"
+    columns = list(single.keys())
+    print(f"{'':<14}" + "".join(f"{c:>13}" for c in columns) + f"{'vs single':>11}")
+    for name, row in report["results"].items():
+        overhead = row[cost] / single[cost] - 1 if single[cost] else 0.0
+        print(f"{name:<14}" + "".join(f"{row[c]:>13}" for c in columns) + f"{overhead:>+10.1%}")
+
+
+if __name__ == "__main__":
+    main()
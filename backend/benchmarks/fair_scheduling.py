@@ -0,0 +1,151 @@
+"""
+Simulates job completion times with one heavy tenant bulk-uploading
+while small tenants trickle in, comparing:
+
+- fifo: every upload goes straight to the task queue (the old behaviour)
+- fair: uploads are QUEUED and released with scheduling.plan_dispatch
+
+Run from the backend directory:
+
+    python -m benchmarks.fair_scheduling [--json]
+"""
+import argparse
+import heapq
+import json
+import random
+from collections import defaultdict, deque
+from typing import Dict, List, Tuple
+
+from scheduling import plan_dispatch
+
+HEAVY_OWNER = "heavy"
+
+
+def make_jobs(args) -> List[Tuple[float, str, str, float]]:
+    """Returns (submit_time, owner, job_id, duration) sorted by submit time."""
+    rng = random.Random(args.seed)
+    jobs = []
+
+    def duration() -> float:
+        return rng.lognormvariate(0, 0.5) * args.mean_job_seconds
+
+    for i in range(args.heavy_jobs):
+        jobs.append((0.0, HEAVY_OWNER, f"{HEAVY_OWNER}-{i}", duration()))
+
+    for t in range(args.small_tenants):
+        owner = f"small-{t}"
+        for i in range(rng.randint(1, 3)):
+            submit = rng.uniform(0, args.horizon_seconds)
+            jobs.append((submit, owner, f"{owner}-{i}", duration()))
+
+    jobs.sort()
+    return jobs
+
+
+def simulate(jobs, policy: str, workers: int, per_owner_limit: int) -> Dict[str, Tuple[float, float]]:
+    """Returns job_id -> (submit_time, finish_time)."""
+    info = {job_id: (submit, owner, dur) for submit, owner, job_id, dur in jobs}
+
+    events = [(submit, 1, job_id) for submit, _, job_id, _ in jobs]
+    heapq.heapify(events)
+
+    fifo: deque = deque()
+    queued: Dict[str, deque] = defaultdict(deque)
+    active: Dict[str, int] = defaultdict(int)
+    running = 0
+    last_owner = None
+    finished: Dict[str, Tuple[float, float]] = {}
+
+    def start(now: float, job_id: str) -> None:
+        nonlocal running
+        _, owner, dur = info[job_id]
+        running += 1
+        active[owner] += 1
+        heapq.heappush(events, (now + dur, 0, job_id))
+
+    while events:
+        now, kind, job_id = heapq.heappop(events)
+        submit, owner, _ = info[job_id]
+
+        if kind == 0:  # completion
+            running -= 1
+            active[owner] -= 1
+            finished[job_id] = (submit, now)
+        elif policy == "fifo":
+            fifo.append(job_id)
+        else:
+            queued[owner].append(job_id)
+
+        if policy == "fifo":
+            while fifo and running < workers:
+                start(now, fifo.popleft())
+        else:
+            plan = plan_dispatch(
+                {o: list(q)[:workers] for o, q in queued.items() if q},
+                active,
+                per_owner_limit=per_owner_limit,
+                slots=workers - running,
+                last_owner=last_owner,
+            )
+            for plan_owner, plan_job in plan:
+                queued[plan_owner].popleft()
+                start(now, plan_job)
+                last_owner = plan_owner
+
+    return finished
+
+
+def percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(finished: Dict[str, Tuple[float, float]]) -> dict:
+    small = [end - start for job_id, (start, end) in finished.items()
+             if not job_id.startswith(HEAVY_OWNER)]
+    heavy_end = max(end for job_id, (_, end) in finished.items()
+                    if job_id.startswith(HEAVY_OWNER))
+
+    return {
+        "small_jobs": len(small),
+        "small_p50_s": round(percentile(small, 50), 1),
+        "small_p95_s": round(percentile(small, 95), 1),
+        "small_p99_s": round(percentile(small, 99), 1),
+        "small_max_s": round(max(small), 1),
+        "heavy_makespan_s": round(heavy_end, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-owner-limit", type=int, default=6)
+    parser.add_argument("--heavy-jobs", type=int, default=500)
+    parser.add_argument("--small-tenants", type=int, default=20)
+    parser.add_argument("--mean-job-seconds", type=float, default=180)
+    parser.add_argument("--horizon-seconds", type=float, default=4 * 3600)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args()
+
+    jobs = make_jobs(args)
+    report = {
+        policy: summarize(
+            simulate(jobs, policy, args.workers, args.per_owner_limit)
+        )
+        for policy in ("fifo", "fair")
+    }
+
+    if args.json:
+        print(json.dumps({"params": vars(args), "results": report}, indent=2))
+        return
+
+    columns = list(report["fifo"].keys())
+    print(f"{'policy':<8}" + "".join(f"{c:>18}" for c in columns))
+    for policy, row in report.items():
+        print(f"{policy:<8}" + "".join(f"{row[c]:>18}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Measures per-process memory and startup time for N worker processes
+loading Whisper either the default way (torch.load per process) or
+from the shared memory-mapped safetensors file.
+
+Each process runs one forward pass so every weight page is touched
+before RSS/PSS are read from /proc/<pid>/smaps_rollup (Linux only).
+"Cold" evicts the weights file from the page cache first; "warm"
+loads again straight after.
+
+Run from the backend directory:
+
+    python -m benchmarks.model_memory --model medium --processes 4 [--json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import time
+
+import torch
+import whisper
+
+from model_store import load_whisper_mmap, prepare_whisper_weights
+
+
+def source_file(model: str, mode: str, weights_dir: str) -> str:
+    if mode == "mmap":
+        return prepare_whisper_weights(model, weights_dir)
+    if os.path.isfile(model):
+        return model
+
+    default = os.path.join(os.path.expanduser("~"), ".cache")
+    download_root = os.path.join(os.getenv("XDG_CACHE_HOME", default), "whisper")
+    whisper.load_model(model, device="cpu", download_root=download_root)  # ensure downloaded
+    return os.path.join(download_root, os.path.basename(whisper._MODELS[model]))
+
+
+def evict_from_page_cache(path: str) -> None:
+    with open(path, "rb") as fp:
+        os.posix_fadvise(fp.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def read_memory(pid: int) -> dict:
+    """Rss and Pss in MiB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as fp:
+        for line in fp:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower() + "_mib"] = int(rest.split()[0]) / 1024
+    return values
+
+
+def child(model: str, path: str, mode: str, threads: int, conn) -> None:
+    torch.set_num_threads(threads)
+
+    start = time.perf_counter()
+    if mode == "mmap":
+        loaded = load_whisper_mmap(path)
+    else:
+        loaded = whisper.load_model(model, device="cpu")
+    load_seconds = time.perf_counter() - start
+
+    # Touch every weight once, like the first transcription would
+    start = time.perf_counter()
+    with torch.no_grad():
+        mel = torch.zeros(1, loaded.dims.n_mels, 2 * loaded.dims.n_audio_ctx)
+        features = loaded.embed_audio(mel)
+        loaded.logits(torch.tensor([[50258]]), features)
+    first_pass_seconds = time.perf_counter() - start
+
+    conn.send((load_seconds, first_pass_seconds))
+    conn.recv()  # stay alive until the parent has measured memory
+
+
+def run_phase(args, mode: str, path: str) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    threads = max(1, (os.cpu_count() or 1) // args.processes)
+
+    workers = []
+    for _ in range(args.processes):
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(
+            target=child, args=(args.model, path, mode, threads, child_conn)
+        )
+        process.start()
+        workers.append((process, parent_conn))
+
+    load_seconds, first_pass_seconds = zip(*(conn.recv() for _, conn in workers))
+    memory = [read_memory(process.pid) for process, _ in workers]
+
+    for process, conn in workers:
+        conn.send("exit")
+        process.join()
+
+    return {
+        "load_s_median": round(statistics.median(load_seconds), 2),
+        "load_s_max": round(max(load_seconds), 2),
+        "first_pass_s_median": round(statistics.median(first_pass_seconds), 2),
+        "rss_mib_per_process": round(statistics.mean(m["rss_mib"] for m in memory), 1),
+        "pss_mib_per_process": round(statistics.mean(m["pss_mib"] for m in memory), 1),
+        "pss_mib_total": round(sum(m["pss_mib"] for m in memory), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="medium", help="model name or checkpoint path")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--weights-dir", default="/tmp/whisper-weights")
+    parser.add_argument("--modes", default="torch,mmap")
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args()
+
+    report = {}
+    for mode in args.modes.split(","):
+        start = time.perf_counter()
+        path = source_file(args.model, mode, args.weights_dir)
+        prepare_seconds = time.perf_counter() - start
+
+        evict_from_page_cache(path)
+        cold = run_phase(args, mode, path)
+        warm = run_phase(args, mode, path)
+
+        report[mode] = {
+            "prepare_s": round(prepare_seconds, 2),
+            "cold": cold,
+            "warm": warm,
+        }
+
+    if args.json:
+        print(json.dumps({"params": vars(args), "results": report}, indent=2))
+        return
+
+    for mode, result in report.items():
+        print(f"{mode} (prepare {result['prepare_s']} s)")
+        for phase in ("cold", "warm"):
+            row = result[phase]
+            print(f"  {phase:<5}" + "".join(f"  {k}={v}" for k, v in row.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Compares plain vs compressed transcript storage on synthetic multi-hour
+transcripts: stored size, row fetch (+ decompress) time and response
+bytes per Content-Encoding.
+
+Postgres already compresses large text values (TOAST), so run it
+against Postgres to compare with what the old column really stored:
+`--database-url` adds the TOAST-compressed sizes (pglz, and lz4 when
+the server supports it) from pg_column_size. Without it, rows go to a
+temporary SQLite file, which stores text uncompressed, so plain_bytes
+overstates the saving.
+
+Run from the backend directory:
+
+    python -m benchmarks.transcript_storage [--database-url URL] [--json]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import zstandard
+from sqlalchemy import (
+    Column,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    func,
+    select,
+    text,
+)
+from sqlalchemy.exc import DBAPIError
+
+from compression import compress_text, decompress_text
+
+WORDS = (
+    "so the next thing we want to look at is how the system handles "
+    "requests when the queue is full and whether we can make that faster "
+    "I think the main point here is that we measure first and then change "
+    "one thing at a time because otherwise you never know what helped"
+).split()
+
+
+def make_transcript(hours: float, rng: random.Random) -> str:
+    """Whisper-style transcript: one timestamped segment every few seconds."""
+    lines = []
+    t = 0.0
+    end = hours * 3600
+    while t < end:
+        length = rng.uniform(2.0, 6.0)
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18)))
+        lines.append(f"[{t:7.2f} → {t + length:7.2f}]  {words.capitalize()}.\n")
+        t += length
+    return "".join(lines)
+
+
+def time_fetch(engine, table, column, ids, decode) -> float:
+    """Median seconds to fetch one row's column and turn it into text."""
+    samples = []
+    with engine.connect() as conn:
+        for file_id in ids:
+            start = time.perf_counter()
+            value = conn.execute(
+                select(table.c[column]).where(table.c.id == file_id)
+            ).scalar_one()
+            decode(value)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def toast_sizes(engine, table, file_id: str, lz4: bool) -> dict:
+    """Bytes Postgres stores for one row's columns, after TOAST compression."""
+    columns = {
+        "toast_pglz_bytes": "transcript",
+        "zstd_column_bytes": "transcript_zst",
+    }
+    if lz4:
+        columns["toast_lz4_bytes"] = "transcript_lz4"
+
+    with engine.connect() as conn:
+        row = conn.execute(
+            select(*(func.pg_column_size(table.c[name]) for name in columns.values()))
+            .where(table.c.id == file_id)
+        ).one()
+
+    return dict(zip(columns, row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--level", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--database-url", help="Postgres URL (default: temporary SQLite)")
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    transcripts = [make_transcript(args.hours, rng) for _ in range(args.rows)]
+    sample = transcripts[0]
+    raw = sample.encode("utf-8")
+
+    # ---- Stored size ----
+    zstd_blob = compress_text(sample, level=args.level)
+    dictionary = zstandard.train_dictionary(
+        112_640, [t.encode("utf-8")[:65536] for t in transcripts[1:]]
+    )
+    zstd_dict_blob = zstandard.ZstdCompressor(
+        level=args.level, dict_data=dictionary
+    ).compress(raw)
+
+    storage = {
+        "plain_bytes": len(raw),
+        "zstd_bytes": len(zstd_blob),
+        "zstd_dict_bytes": len(zstd_dict_blob),
+        "gzip_bytes": len(gzip.compress(raw, compresslevel=6)),
+    }
+
+    # ---- Row fetch time ----
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url)
+        postgres = engine.dialect.name == "postgresql"
+
+        metadata = MetaData()
+        table = Table(
+            "transcript_storage_bench",
+            metadata,
+            Column("id", String, primary_key=True),
+            Column("transcript", Text),
+            Column("transcript_zst", LargeBinary),
+            *([Column("transcript_lz4", Text)] if postgres else []),
+        )
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+
+        lz4 = False
+        if postgres:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} "
+                        "ALTER COLUMN transcript_lz4 SET COMPRESSION lz4"
+                    ))
+                lz4 = True
+            except DBAPIError:  # server built without lz4
+                pass
+
+        with engine.begin() as conn:
+            conn.execute(table.insert(), [
+                {
+                    "id": str(i),
+                    "transcript": transcript,
+                    "transcript_zst": compress_text(transcript, level=args.level),
+                    **({"transcript_lz4": transcript} if postgres else {}),
+                }
+                for i, transcript in enumerate(transcripts)
+            ])
+
+        if postgres:
+            storage.update(toast_sizes(engine, table, "0", lz4))
+
+        ids = [str(i) for i in range(args.rows)]
+        fetch = {
+            "plain_fetch_ms": time_fetch(engine, table, "transcript", ids, lambda v: v) * 1000,
+            "zstd_fetch_decompress_ms": time_fetch(engine, table, "transcript_zst", ids, decompress_text) * 1000,
+            "zstd_fetch_passthrough_ms": time_fetch(engine, table, "transcript_zst", ids, lambda v: v) * 1000,
+        }
+        metadata.drop_all(engine)
+        engine.dispose()
+
+    # ---- Response bytes (download endpoint) ----
+    response = {
+        "identity": len(raw),
+        "gzip": storage["gzip_bytes"],
+        "zstd": storage["zstd_bytes"],  # stored bytes, sent as-is
+    }
+
+    report = {
+        "params": {
+            **{k: v for k, v in vars(args).items() if k != "database_url"},
+            "database": engine.dialect.name,
+        },
+        "storage": storage,
+        "fetch": {k: round(v, 3) for k, v in fetch.items()},
+        "response_bytes": response,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for section in ("storage", "fetch", "response_bytes"):
+        print(section)
+        for key, value in report[section].items():
+            print(f"  {key:<28}{value:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import gzip
+from typing import Dict, Optional
+
+import zstandard
+from fastapi.responses import Response
+
+# Supported response encodings, best first
+ENCODINGS = ("zstd", "gzip", "identity")
+
+DEFAULT_ZSTD_LEVEL = 10
+GZIP_LEVEL = 6
+
+
+# -----------------------------
+# Stored transcript compression
+# -----------------------------
+def compress_text(text: str, level: int = DEFAULT_ZSTD_LEVEL) -> bytes:
+    """
+    Compresses text into a standard zstd frame. No dictionary is used,
+    so the stored bytes can be sent as-is with Content-Encoding: zstd.
+    """
+    return zstandard.ZstdCompressor(level=level).compress(text.encode("utf-8"))
+
+
+def decompress_text(blob: bytes) -> str:
+    return zstandard.ZstdDecompressor().decompress(blob).decode("utf-8")
+
+
+# -----------------------------
+# Content-Encoding negotiation
+# -----------------------------
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    """Picks the best encoding the client accepts (honouring q=0)."""
+    if not accept_encoding:
+        return "identity"
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    def weight(encoding: str) -> float:
+        if encoding in weights:
+            return weights[encoding]
+        if "*" in weights:
+            return weights["*"]
+        # identity is acceptable unless explicitly refused
+        return 1.0 if encoding == "identity" else 0.0
+
+    best = max(ENCODINGS, key=lambda e: (weight(e), -ENCODINGS.index(e)))
+    return best if weight(best) > 0 else "identity"
+
+
+def encoded_response(
+    accept_encoding: Optional[str],
+    media_type: str,
+    text: Optional[str] = None,
+    zstd_body: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Builds a response in the negotiated encoding. When the client
+    accepts zstd and `zstd_body` is given, those bytes are sent as-is;
+    otherwise the text is decompressed (if needed) and re-encoded.
+    """
+    encoding = negotiate_encoding(accept_encoding)
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+
+    if encoding == "zstd" and zstd_body is not None:
+        body = zstd_body
+    else:
+        if text is None:
+            text = decompress_text(zstd_body)
+        raw = text.encode("utf-8")
+
+        if encoding == "zstd":
+            body = zstandard.ZstdCompressor(level=3).compress(raw)
+        elif encoding == "gzip":
+            body = gzip.compress(raw, compresslevel=GZIP_LEVEL)
+        else:
+            body = raw
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -9,15 +9,17 @@ POSTGRES_USER = os.environ["POSTGRES_USER"]
 POSTGRES_PASSWORD = os.environ["POSTGRES_PASSWORD"]
 POSTGRES_DB = os.environ["POSTGRES_DB"]
 
-DATABASE_URL = (
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
     f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
-    f"@db:5432/{POSTGRES_DB}"
+    f"@db:5432/{POSTGRES_DB}",
 )
 
 # --- Temporal ---
 TEMPORAL_ENDPOINT = os.getenv("TEMPORAL_ENDPOINT", "temporal:7233")
 TEMPORAL_NAMESPACE = os.getenv("TEMPORAL_NAMESPACE", "default")
 MEDIA_TASK_QUEUE = os.getenv("MEDIA_TASK_QUEUE", "media-task-queue")
+TRANSCRIBE_TASK_QUEUE = os.getenv("TRANSCRIBE_TASK_QUEUE", "media-transcribe-queue")
 
 # --- MinIO / S3 ---
 MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio:9000")
@@ -27,3 +29,48 @@ MEDIA_BUCKET = os.getenv("MEDIA_BUCKET", "media-vault")
 
 # --- Summarizer ---
 SUMMARIZER_URL = os.getenv("SUMMARIZER_URL","http://summarizer:9000/summarize")
+
+# --- Retention ---
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "30"))  # 0 disables media purge
+RETENTION_INTERVAL_SECONDS = int(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "200"))
+RETENTION_BATCH_PAUSE_SECONDS = float(os.getenv("RETENTION_BATCH_PAUSE_SECONDS", "1.0"))
+# Must outlive a job waiting for a transcription slot plus its own run (12 h each);
+# a running transcription also touches its dir every chunk
+TEMP_DIR_MAX_AGE_HOURS = int(os.getenv("TEMP_DIR_MAX_AGE_HOURS", "36"))
+
+# --- Fair scheduling ---
+INGEST_BURST = int(os.getenv("INGEST_BURST", "100"))  # files an owner can upload at once
+INGEST_RATE_PER_MINUTE = float(os.getenv("INGEST_RATE_PER_MINUTE", "60"))
+# Only enforced while other owners have queued work; otherwise spare slots are filled
+PER_OWNER_CONCURRENCY = int(os.getenv("PER_OWNER_CONCURRENCY", "6"))
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "1"))
+# One job transcribing per worker process, plus one downloading or summarizing
+JOBS_PER_WORKER_PROCESS = int(os.getenv("JOBS_PER_WORKER_PROCESS", "2"))
+MAX_INFLIGHT_JOBS = int(
+    os.getenv("MAX_INFLIGHT_JOBS", str(JOBS_PER_WORKER_PROCESS * WORKER_PROCESSES))
+)
+DISPATCH_INTERVAL_SECONDS = float(os.getenv("DISPATCH_INTERVAL_SECONDS", "5"))
+# PROCESSING jobs older than this are checked against Temporal
+RECONCILE_AFTER_SECONDS = float(os.getenv("RECONCILE_AFTER_SECONDS", "900"))
+RECONCILE_INTERVAL_SECONDS = float(os.getenv("RECONCILE_INTERVAL_SECONDS", "60"))
+
+# --- Transcript storage ---
+TRANSCRIPT_ZSTD_LEVEL = int(os.getenv("TRANSCRIPT_ZSTD_LEVEL", "10"))
+
+# --- Whisper model hosting ---
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "medium")
+# Share one memory-mapped copy of the weights across worker processes (CPU only)
+WHISPER_MMAP_WEIGHTS = os.getenv("WHISPER_MMAP_WEIGHTS", "false").lower() == "true"
+WHISPER_WEIGHTS_DIR = os.getenv("WHISPER_WEIGHTS_DIR", "/models/whisper")
+
+# --- Live transcripts ---
+# Several Whisper windows per chunk, so the re-decoded chunk boundary stays cheap
+# (benchmarks/chunked_transcription); live segments appear once per chunk
+TRANSCRIBE_CHUNK_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "300"))
+# Transcriptions a worker process takes from TRANSCRIBE_TASK_QUEUE at once
+TRANSCRIBE_CONCURRENCY = int(os.getenv("TRANSCRIBE_CONCURRENCY", "1"))
+SEGMENT_FLUSH_SIZE = int(os.getenv("SEGMENT_FLUSH_SIZE", "20"))
+SEGMENT_FLUSH_INTERVAL_SECONDS = float(os.getenv("SEGMENT_FLUSH_INTERVAL_SECONDS", "2"))
+SEGMENTS_LONG_POLL_SECONDS = float(os.getenv("SEGMENTS_LONG_POLL_SECONDS", "20"))
+SEGMENTS_POLL_INTERVAL_SECONDS = float(os.getenv("SEGMENTS_POLL_INTERVAL_SECONDS", "1"))
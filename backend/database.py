@@ -1,5 +1,6 @@
 # database.py
 import os
+from sqlalchemy import inspect, text
 from sqlmodel import SQLModel, Session, create_engine
 
 from config import DATABASE_URL
@@ -13,6 +14,26 @@ engine = create_engine(
 def init_db() -> None:
     """Create tables (called once at startup)."""
     SQLModel.metadata.create_all(engine)
+    add_missing_columns()
+
+def add_missing_columns() -> None:
+    """create_all() never alters existing tables, so add new nullable columns."""
+    inspector = inspect(engine)
+
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                ))
 
 def get_session():
     """FastAPI / general-purpose session dependency."""
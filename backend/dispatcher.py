@@ -0,0 +1,202 @@
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, func, select, update
+from temporalio.client import Client as TemporalClient, WorkflowExecutionStatus
+from temporalio.exceptions import WorkflowAlreadyStartedError
+from temporalio.service import RPCError, RPCStatusCode
+
+from workflow import MediaProcessingWorkflow
+from models import MediaRecord
+from database import engine
+from scheduling import plan_dispatch
+from config import (
+    MEDIA_TASK_QUEUE,
+    PER_OWNER_CONCURRENCY,
+    MAX_INFLIGHT_JOBS,
+    DISPATCH_INTERVAL_SECONDS,
+    RECONCILE_AFTER_SECONDS,
+    RECONCILE_INTERVAL_SECONDS,
+)
+
+
+class FairDispatcher:
+    """
+    Releases QUEUED media jobs to the transcription queue, round-robin
+    across owners, so one owner's bulk upload cannot starve the others.
+    """
+
+    def __init__(self):
+        self.wake_event = asyncio.Event()
+        self.last_owner: Optional[str] = None
+        self.reconciled_at = 0.0
+
+    def wake(self) -> None:
+        """Ask for a dispatch pass now instead of at the next interval."""
+        self.wake_event.set()
+
+    # -----------------------------
+    # DB helpers (run off the event loop)
+    # -----------------------------
+    def _load_state(self) -> Tuple[Dict[str, List[Tuple[str, str]]], Dict[str, int]]:
+        with Session(engine) as session:
+            active_rows = session.exec(
+                select(MediaRecord.owner_id, func.count())
+                .where(MediaRecord.status == "PROCESSING")
+                .group_by(MediaRecord.owner_id)
+            ).all()
+
+            # At most MAX_INFLIGHT_JOBS jobs per owner can be released in one pass
+            rank = func.row_number().over(
+                partition_by=MediaRecord.owner_id,
+                order_by=MediaRecord.created_at,
+            ).label("rank")
+            queued_jobs = (
+                select(MediaRecord.id, MediaRecord.owner_id, MediaRecord.s3_key, rank)
+                .where(MediaRecord.status == "QUEUED")
+                .subquery()
+            )
+            queued_rows = session.exec(
+                select(queued_jobs.c.id, queued_jobs.c.owner_id, queued_jobs.c.s3_key)
+                .where(queued_jobs.c.rank <= MAX_INFLIGHT_JOBS)
+                .order_by(queued_jobs.c.owner_id, queued_jobs.c.rank)
+            ).all()
+
+        queued: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        for file_id, owner_id, s3_key in queued_rows:
+            queued[owner_id].append((file_id, s3_key))
+
+        return queued, dict(active_rows)
+
+    def _set_status(self, file_id: str, expected: str, status: str) -> bool:
+        values = {"status": status}
+        if status == "PROCESSING":
+            values["dispatched_at"] = datetime.utcnow()
+
+        with Session(engine) as session:
+            result = session.exec(
+                update(MediaRecord)
+                .where(MediaRecord.id == file_id)
+                .where(MediaRecord.status == expected)
+                .values(**values)
+            )
+            session.commit()
+            return result.rowcount == 1
+
+    def _stale_jobs(self) -> List[str]:
+        cutoff = datetime.utcnow() - timedelta(seconds=RECONCILE_AFTER_SECONDS)
+        with Session(engine) as session:
+            return session.exec(
+                select(MediaRecord.id)
+                .where(MediaRecord.status == "PROCESSING")
+                # Rows claimed before dispatched_at existed fall back to created_at
+                .where(
+                    func.coalesce(MediaRecord.dispatched_at, MediaRecord.created_at)
+                    < cutoff
+                )
+            ).all()
+
+    # -----------------------------
+    # Dispatch
+    # -----------------------------
+    async def dispatch_once(self, client: TemporalClient) -> int:
+        queued, active = await asyncio.to_thread(self._load_state)
+
+        s3_keys = {
+            file_id: s3_key
+            for jobs in queued.values()
+            for file_id, s3_key in jobs
+        }
+        plan = plan_dispatch(
+            {owner: [file_id for file_id, _ in jobs] for owner, jobs in queued.items()},
+            active,
+            per_owner_limit=PER_OWNER_CONCURRENCY,
+            slots=MAX_INFLIGHT_JOBS - sum(active.values()),
+            last_owner=self.last_owner,
+        )
+
+        released = 0
+        for owner_id, file_id in plan:
+            # Claim the row first so a concurrent dispatcher or a delete wins cleanly
+            claimed = await asyncio.to_thread(
+                self._set_status, file_id, "QUEUED", "PROCESSING"
+            )
+            if not claimed:
+                continue
+
+            try:
+                await client.start_workflow(
+                    MediaProcessingWorkflow.run,
+                    args=[s3_keys[file_id], file_id],
+                    id=f"media-wf-{file_id}",
+                    task_queue=MEDIA_TASK_QUEUE,
+                )
+            except WorkflowAlreadyStartedError:
+                pass
+            except Exception as err:
+                print(f"Failed to start workflow for {file_id}: {err}")
+                await asyncio.to_thread(
+                    self._set_status, file_id, "PROCESSING", "QUEUED"
+                )
+                break
+
+            self.last_owner = owner_id
+            released += 1
+
+        return released
+
+    # -----------------------------
+    # Reconcile
+    # -----------------------------
+    async def reconcile(self, client: TemporalClient) -> int:
+        """
+        Frees the slots of PROCESSING jobs whose workflow is not running:
+        back to QUEUED when it was never started (e.g. a crash between the
+        claim and start_workflow), FAILED when it closed without marking
+        the job (terminated, timed out, cancelled outside a delete).
+        """
+        fixed = 0
+        for file_id in await asyncio.to_thread(self._stale_jobs):
+            handle = client.get_workflow_handle(f"media-wf-{file_id}")
+            try:
+                description = await handle.describe()
+            except RPCError as err:
+                if err.status != RPCStatusCode.NOT_FOUND:
+                    raise
+                status = "QUEUED"
+            else:
+                if description.status == WorkflowExecutionStatus.RUNNING:
+                    continue
+                status = "FAILED"
+
+            if await asyncio.to_thread(self._set_status, file_id, "PROCESSING", status):
+                print(f"Reconciled stuck job {file_id} -> {status}")
+                fixed += 1
+
+        return fixed
+
+    async def run(self, client: TemporalClient) -> None:
+        while True:
+            if time.monotonic() - self.reconciled_at >= RECONCILE_INTERVAL_SECONDS:
+                try:
+                    await self.reconcile(client)
+                except Exception as err:
+                    print(f"Reconcile pass failed: {err}")
+                self.reconciled_at = time.monotonic()
+
+            try:
+                await self.dispatch_once(client)
+            except Exception as err:
+                print(f"Dispatch pass failed: {err}")
+
+            try:
+                await asyncio.wait_for(
+                    self.wake_event.wait(),
+                    timeout=DISPATCH_INTERVAL_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                pass
+            self.wake_event.clear()
@@ -1,19 +1,33 @@
+import asyncio
+import math
+import time
 import uuid
 import io
 import os
 from contextlib import asynccontextmanager
-from typing import List
+from typing import List, Optional
 from sqlmodel import Session, select
-from fastapi import FastAPI, UploadFile, Depends, HTTPException, File
-from fastapi.responses import Response
+from fastapi import FastAPI, UploadFile, Depends, HTTPException, File, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
 from minio import Minio
 from temporalio.client import Client as TemporalClient
+from temporalio.service import RPCError
 
 from workflow import MediaProcessingWorkflow
 from models import MediaRecord
-from database import get_session, init_db
-from schemas import MediaDetails, MediaHistoryItem
+from database import engine, get_session, init_db
+from compression import decompress_text, encoded_response
+from dispatcher import FairDispatcher
+from scheduling import OwnerRateLimiter
+from segments import load_segments
+from retention import delete_records, remove_objects
+from schemas import (
+    BulkDeleteRequest,
+    BulkDeleteResult,
+    MediaDetails,
+    MediaHistoryItem,
+    TranscriptSegmentsPage,
+)
 from config import (
     MINIO_ENDPOINT,
     MINIO_ACCESS_KEY,
@@ -21,7 +35,10 @@ from config import (
     MEDIA_BUCKET,
     TEMPORAL_ENDPOINT,
     TEMPORAL_NAMESPACE,
-    MEDIA_TASK_QUEUE,
+    INGEST_BURST,
+    INGEST_RATE_PER_MINUTE,
+    SEGMENTS_LONG_POLL_SECONDS,
+    SEGMENTS_POLL_INTERVAL_SECONDS,
 )
 
 storage_client = Minio(
@@ -34,6 +51,10 @@ storage_client = Minio(
 # Global Temporal Client holder
 temporal_state = {"client": None}
 
+# Per-owner ingest quota and fair release of queued jobs
+ingest_limiter = OwnerRateLimiter(INGEST_BURST, INGEST_RATE_PER_MINUTE)
+dispatcher = FairDispatcher()
+
 # --- 2. THE LIFESPAN HANDLER ---
 # Define this BEFORE creating the FastAPI app instance
 @asynccontextmanager
@@ -55,9 +76,33 @@ async def lifespan(app: FastAPI):
         print("✅ Connected to Temporal Server")
     except Exception as e:
         print(f"❌ Could not connect to Temporal: {e}")
-    
+
+    dispatch_task = None
+    if temporal_state["client"]:
+        dispatch_task = asyncio.create_task(
+            dispatcher.run(temporal_state["client"])
+        )
+
     yield
-    # Shutdown logic goes here if needed
+
+    if dispatch_task:
+        dispatch_task.cancel()
+
+async def cancel_media_workflow(file_id: str) -> None:
+    """Stops an in-flight workflow so it doesn't keep working on deleted media."""
+    client = temporal_state["client"]
+    if not client:
+        return
+
+    handle = client.get_workflow_handle(f"media-wf-{file_id}")
+    try:
+        # The signal stops the workflow at its next step; the cancel
+        # request stops it waiting on the activity that is currently running
+        await handle.signal(MediaProcessingWorkflow.cancel)
+        await handle.cancel()
+    except RPCError as err:
+        # Workflow already finished or never started
+        print(f"Could not cancel workflow for {file_id}: {err}")
 
 # --- 3. INITIALIZE APP ---
 app = FastAPI(title="DurableAI Backend", lifespan=lifespan)
@@ -90,8 +135,7 @@ async def upload_media(
             detail="Temporal client not available",
         )
 
-    results = []
-
+    # ---- Validate every file before taking quota ----
     for file in files:
         if not file.content_type or not (
             file.content_type.startswith("audio/")
@@ -102,6 +146,23 @@ async def upload_media(
                 detail=f"Invalid media type: {file.filename}",
             )
 
+    # ---- Per-owner ingest quota ----
+    retry_after = ingest_limiter.try_acquire(user_id, len(files))
+    if retry_after:
+        if math.isinf(retry_after) or len(files) > INGEST_BURST:
+            raise HTTPException(
+                status_code=429,
+                detail=f"At most {INGEST_BURST} files can be uploaded at once",
+            )
+        raise HTTPException(
+            status_code=429,
+            detail="Upload quota exceeded, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    results = []
+
+    for file in files:
         file_id = str(uuid.uuid4())
         s3_key = f"uploads/{user_id}/{file_id}-{file.filename}"
 
@@ -117,32 +178,24 @@ async def upload_media(
                 content_type=file.content_type,
             )
 
-            # ---- Create DB record ----
+            # ---- Create DB record (queued for the dispatcher) ----
             record = MediaRecord(
                 id=file_id,
                 filename=file.filename,
                 owner_id=user_id,
                 s3_key=s3_key,
-                status="PROCESSING",
+                status="QUEUED",
             )
 
             session.add(record)
             session.commit()
 
-            # ---- Start Temporal workflow ----
-            handle = await client.start_workflow(
-                MediaProcessingWorkflow.run,
-                args=[s3_key, file_id],
-                id=f"media-wf-{file_id}",
-                task_queue=MEDIA_TASK_QUEUE,
-            )
-
             results.append(
                 {
                     "file_id": file_id,
                     "filename": file.filename,
-                    "workflow_id": handle.id,
-                    "status": "PROCESSING",
+                    "workflow_id": f"media-wf-{file_id}",
+                    "status": "QUEUED",
                 }
             )
 
@@ -153,54 +206,187 @@ async def upload_media(
                 detail=f"Failed to process {file.filename}: {err}",
             )
 
+    dispatcher.wake()
+
     return {
         "count": len(results),
         "items": results,
     }
 
 
+def transcript_text(record: MediaRecord) -> Optional[str]:
+    """Returns the transcript, decompressing it only when it's needed."""
+    if record.transcript_zst is not None:
+        return decompress_text(record.transcript_zst)
+    return record.transcript
+
+
 @app.get("/history", response_model=list[MediaHistoryItem])
-async def get_history(session: Session = Depends(get_session)):
+async def get_history(
+    session: Session = Depends(get_session),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    # Only the listed columns, so transcripts are never loaded here
     statement = (
-        select(MediaRecord)
+        select(
+            MediaRecord.id,
+            MediaRecord.filename,
+            MediaRecord.status,
+            MediaRecord.created_at,
+        )
         .order_by(MediaRecord.created_at.desc())
+        .offset(offset)
+        .limit(limit)
     )
     return session.exec(statement).all()
 
 @app.get("/media/{file_id}/results", response_model=MediaDetails)
-async def get_results(file_id: str, session: Session = Depends(get_session)):
+async def get_results(
+    file_id: str,
+    session: Session = Depends(get_session),
+    accept_encoding: Optional[str] = Header(None),
+):
     record = session.get(MediaRecord, file_id)
     if not record:
         raise HTTPException(status_code=404, detail="Not found")
-    return record
+
+    details = MediaDetails(
+        id=record.id,
+        filename=record.filename,
+        status=record.status,
+        transcript=transcript_text(record),
+        summary=record.summary,
+        tokens=record.tokens,
+        created_at=record.created_at,
+    )
+
+    return encoded_response(
+        accept_encoding,
+        media_type="application/json",
+        text=details.model_dump_json(),
+    )
+
+def media_status(file_id: str) -> Optional[str]:
+    with Session(engine) as session:
+        return session.exec(
+            select(MediaRecord.status).where(MediaRecord.id == file_id)
+        ).one_or_none()
+
+
+@app.get("/media/{file_id}/segments", response_model=TranscriptSegmentsPage)
+async def get_segments(
+    file_id: str,
+    cursor: int = Query(0, ge=0),
+    wait: float = Query(0, ge=0, le=SEGMENTS_LONG_POLL_SECONDS),
+    limit: int = Query(500, ge=1, le=1000),
+):
+    """
+    Live transcript segments from `cursor` on. With `wait`, long-polls
+    until new segments arrive, the job finishes or `wait` seconds pass.
+    """
+    deadline = time.monotonic() + wait
+
+    # Short-lived sessions, so a waiting client doesn't hold a DB connection
+    while True:
+        status = await asyncio.to_thread(media_status, file_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail="Not found")
+
+        segments = await asyncio.to_thread(load_segments, file_id, cursor, limit)
+        finished = status in ("COMPLETED", "FAILED")
+
+        if segments or finished or time.monotonic() >= deadline:
+            break
+
+        await asyncio.sleep(SEGMENTS_POLL_INTERVAL_SECONDS)
+
+    return {
+        "file_id": file_id,
+        "status": status,
+        "segments": segments,
+        "next_cursor": segments[-1]["seq"] + 1 if segments else cursor,
+        "done": finished and len(segments) < limit,
+    }
+
 
 @app.delete("/media/{file_id}")
 async def delete_media(file_id: str, session: Session = Depends(get_session)):
     record = session.get(MediaRecord, file_id)
     if not record:
         raise HTTPException(status_code=404, detail="Not found")
-    
-    try:
-        storage_client.remove_object(MEDIA_BUCKET, record.s3_key)
-    except:
-        pass
 
-    session.delete(record)
-    session.commit()
+    if record.status == "PROCESSING":
+        await cancel_media_workflow(record.id)
+
+    failed = await asyncio.to_thread(remove_objects, storage_client, [record.s3_key])
+    if failed:
+        # Keep the row so the object is not orphaned; deleting again retries
+        raise HTTPException(
+            status_code=502,
+            detail="Could not remove the stored media, try again later",
+        )
+
+    delete_records(session, [record.id])
     return {"status": "deleted"}
 
 
+@app.post("/media/bulk-delete", response_model=BulkDeleteResult)
+async def bulk_delete_media(
+    request: BulkDeleteRequest,
+    session: Session = Depends(get_session),
+):
+    file_ids = list(dict.fromkeys(request.ids))
+    if not file_ids:
+        raise HTTPException(status_code=400, detail="No ids given")
+
+    statement = select(MediaRecord.id, MediaRecord.s3_key, MediaRecord.status).where(
+        MediaRecord.id.in_(file_ids)
+    )
+    rows = session.exec(statement).all()
+    found = {file_id for file_id, _, _ in rows}
+
+    # ---- Stop in-flight workflows ----
+    # Only PROCESSING jobs have one, and the dispatcher caps those at MAX_INFLIGHT_JOBS
+    await asyncio.gather(
+        *(
+            cancel_media_workflow(file_id)
+            for file_id, _, status in rows
+            if status == "PROCESSING"
+        )
+    )
+
+    # ---- Remove objects (multi-object delete) ----
+    failed = set(await asyncio.to_thread(
+        remove_objects, storage_client, [s3_key for _, s3_key, _ in rows]
+    ))
+
+    # ---- Remove rows (single statement) ----
+    # Keep rows whose object could not be removed, so it is never orphaned
+    kept = [file_id for file_id, s3_key, _ in rows if s3_key in failed]
+    deleted = delete_records(
+        session, [file_id for file_id, s3_key, _ in rows if s3_key not in failed]
+    )
+
+    return {
+        "deleted": deleted,
+        "not_found": [file_id for file_id in file_ids if file_id not in found],
+        "storage_errors": kept,
+    }
+
+
 @app.get("/media/{file_id}/transcript/download")
 async def download_transcript(
     file_id: str,
     session: Session = Depends(get_session),
+    accept_encoding: Optional[str] = Header(None),
 ):
     record = session.get(MediaRecord, file_id)
 
     if not record:
         raise HTTPException(status_code=404, detail="Media not found")
 
-    if record.status == "PROCESSING":
+    if record.status in ("QUEUED", "PROCESSING"):
         raise HTTPException(
             status_code=409,
             detail="Transcript not ready yet",
@@ -212,7 +398,7 @@ async def download_transcript(
             detail="Transcript generation failed",
         )
 
-    if not record.transcript:
+    if not record.transcript and not record.transcript_zst:
         raise HTTPException(
             status_code=404,
             detail="Transcript is empty or unavailable",
@@ -220,9 +406,12 @@ async def download_transcript(
 
     filename = f"{record.filename}.txt"
 
-    return Response(
-        content=record.transcript,
-        media_type="text/plain",
+    # Stored zstd bytes go out untouched when the client accepts zstd
+    return encoded_response(
+        accept_encoding,
+        media_type="text/plain; charset=utf-8",
+        text=record.transcript,
+        zstd_body=record.transcript_zst,
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"'
         },
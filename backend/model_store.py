@@ -0,0 +1,184 @@
+import json
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Dict
+
+import torch
+import whisper
+from safetensors.torch import save_file
+from whisper.model import ModelDimensions, Whisper
+
+# safetensors dtype codes -> torch dtypes
+_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+
+def weights_path(name: str, weights_dir: str) -> str:
+    """Where the converted weights for a model name or checkpoint live."""
+    base = os.path.splitext(os.path.basename(name))[0]
+    return os.path.join(weights_dir, f"whisper-{base}.safetensors")
+
+
+# -----------------------------
+# One-off conversion
+# -----------------------------
+def export_whisper(name: str, path: str) -> str:
+    """
+    Converts a Whisper checkpoint to a safetensors file that can be
+    memory-mapped. Weights are stored as fp32 (what the CPU model runs
+    with), together with the non-persistent buffers, so loading never
+    has to materialise a model first.
+    """
+    model = whisper.load_model(name, device="cpu")
+    persistent = set(model.state_dict().keys())
+
+    tensors: Dict[str, torch.Tensor] = {}
+    sparse, non_persistent = [], []
+
+    for param_name, param in model.named_parameters():
+        tensors[param_name] = param.detach().contiguous()
+
+    for buffer_name, buffer in model.named_buffers():
+        if buffer.is_sparse:
+            buffer = buffer.to_dense()
+            sparse.append(buffer_name)
+        if buffer_name not in persistent:
+            non_persistent.append(buffer_name)
+        tensors[buffer_name] = buffer.contiguous()
+
+    metadata = {
+        "dims": json.dumps(asdict(model.dims)),
+        "sparse_buffers": json.dumps(sparse),
+        "non_persistent_buffers": json.dumps(non_persistent),
+    }
+
+    # Write to a temp file and rename, so concurrent readers never see a partial file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        save_file(tensors, tmp_path, metadata=metadata)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return path
+
+
+# -----------------------------
+# Shared loading
+# -----------------------------
+def _map_tensors(path: str):
+    """
+    Maps a safetensors file privately (copy-on-write) and returns tensors
+    that point straight into the mapping, plus the file metadata.
+    """
+    with open(path, "rb") as fp:
+        mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    header_len = int.from_bytes(mapped[:8], "little")
+    header = json.loads(mapped[8:8 + header_len])
+    metadata = header.pop("__metadata__", {})
+    data_start = 8 + header_len
+
+    tensors: Dict[str, torch.Tensor] = {}
+    for name, info in header.items():
+        dtype = _DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        itemsize = torch.empty((), dtype=dtype).element_size()
+        count = (end - begin) // itemsize
+
+        if count == 0:
+            tensor = torch.empty(0, dtype=dtype)
+        else:
+            tensor = torch.frombuffer(
+                mapped, dtype=dtype, count=count, offset=data_start + begin
+            )
+        tensors[name] = tensor.view(info["shape"])
+
+    return tensors, metadata
+
+
+@contextmanager
+def _empty_weights():
+    """
+    Moves parameters to the meta device as modules register them, so
+    building a model allocates and initialises no real weights.
+    """
+    register_parameter = torch.nn.Module.register_parameter
+
+    def register_on_meta(module, name, param):
+        register_parameter(module, name, param)
+        if param is not None:
+            module._parameters[name] = torch.nn.Parameter(
+                param.to("meta"), requires_grad=param.requires_grad
+            )
+
+    # The weights get replaced anyway, so skip random initialisation too
+    init_functions = {
+        name: getattr(torch.nn.init, name)
+        for name in ("normal_", "uniform_", "kaiming_uniform_", "zeros_", "ones_")
+    }
+
+    torch.nn.Module.register_parameter = register_on_meta
+    for name in init_functions:
+        setattr(torch.nn.init, name, lambda tensor, *args, **kwargs: tensor)
+    try:
+        yield
+    finally:
+        torch.nn.Module.register_parameter = register_parameter
+        for name, function in init_functions.items():
+            setattr(torch.nn.init, name, function)
+
+
+def load_whisper_mmap(path: str) -> Whisper:
+    """
+    Builds a CPU Whisper model whose weights live in the page cache.
+    Every process mapping the same file shares one physical copy, and
+    a warm start only has to map the file instead of reading it.
+    """
+    tensors, metadata = _map_tensors(path)
+    dims = ModelDimensions(**json.loads(metadata["dims"]))
+
+    with _empty_weights():
+        model = Whisper(dims)
+
+    state = {name: tensors[name] for name in model.state_dict().keys()}
+    model.load_state_dict(state, assign=True)
+
+    sparse = set(json.loads(metadata.get("sparse_buffers", "[]")))
+    for name in json.loads(metadata.get("non_persistent_buffers", "[]")):
+        tensor = tensors[name].to_sparse() if name in sparse else tensors[name]
+        module_path, _, leaf = name.rpartition(".")
+        model.get_submodule(module_path).register_buffer(
+            leaf, tensor, persistent=False
+        )
+
+    model.requires_grad_(False)
+    return model
+
+
+def prepare_whisper_weights(name: str, weights_dir: str) -> str:
+    """Converts the model once; later calls reuse the existing file."""
+    path = weights_path(name, weights_dir)
+    if not os.path.exists(path):
+        export_whisper(name, path)
+    return path
+
+
+def load_whisper_shared(name: str, weights_dir: str) -> Whisper:
+    return load_whisper_mmap(prepare_whisper_weights(name, weights_dir))
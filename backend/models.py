@@ -1,5 +1,5 @@
 # models.py
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Column, LargeBinary
 from typing import Optional
 from datetime import datetime
 import uuid
@@ -14,13 +14,18 @@ class MediaRecord(SQLModel, table=True):
     owner_id: str  # From auth system (e.g. Keycloak)
 
     # Workflow state
-    status: str = "PROCESSING"  # PROCESSING | COMPLETED | FAILED
+    status: str = "QUEUED"  # QUEUED | PROCESSING | COMPLETED | FAILED
+    dispatched_at: Optional[datetime] = None  # when the dispatcher claimed the job
 
     # Storage
     s3_key: str
 
     # Results
-    transcript: Optional[str] = None
+    transcript: Optional[str] = None  # legacy plain-text rows
+    transcript_zst: Optional[bytes] = Field(  # zstd-compressed transcript
+        default=None,
+        sa_column=Column(LargeBinary),
+    )
     summary: Optional[str] = None
 
     # Accounting
@@ -28,3 +33,14 @@ class MediaRecord(SQLModel, table=True):
 
     # Metadata
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TranscriptSegment(SQLModel, table=True):
+    """Segments flushed while a job is still transcribing (live view)."""
+
+    file_id: str = Field(primary_key=True)
+    seq: int = Field(primary_key=True)
+
+    start_time: float
+    end_time: float
+    text: str
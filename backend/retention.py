@@ -0,0 +1,168 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Sequence
+
+from minio import Minio
+from minio.deleteobjects import DeleteObject
+from sqlmodel import Session, delete, select
+
+from database import engine
+from models import MediaRecord
+from segments import delete_segments
+from config import (
+    MEDIA_BUCKET,
+    RETENTION_DAYS,
+    RETENTION_INTERVAL_SECONDS,
+    RETENTION_BATCH_SIZE,
+    RETENTION_BATCH_PAUSE_SECONDS,
+    TEMP_DIR_MAX_AGE_HOURS,
+)
+
+# MinIO / S3 multi-object delete accepts at most 1000 keys per request
+MAX_KEYS_PER_DELETE = 1000
+
+TEMP_DIR_PREFIX = "media_"
+
+
+# -----------------------------
+# Shared delete helpers
+# -----------------------------
+def remove_objects(client: Minio, keys: Iterable[str]) -> List[str]:
+    """
+    Removes objects using multi-object delete, in batches.
+    Returns the keys that could not be removed.
+    """
+    keys = [key for key in keys if key]
+    failed: List[str] = []
+
+    for start in range(0, len(keys), MAX_KEYS_PER_DELETE):
+        batch = keys[start:start + MAX_KEYS_PER_DELETE]
+
+        # remove_objects is lazy: errors are only reported while iterating
+        errors = client.remove_objects(
+            MEDIA_BUCKET,
+            [DeleteObject(key) for key in batch],
+        )
+        for err in errors:
+            print(f"Failed to remove {err.name}: {err.message}")
+            failed.append(err.name)
+
+    return failed
+
+
+def delete_records(session: Session, file_ids: Sequence[str]) -> int:
+    """Deletes media rows (and their live segments) in a single statement each."""
+    if not file_ids:
+        return 0
+
+    delete_segments(session, list(file_ids))
+    result = session.exec(
+        delete(MediaRecord).where(MediaRecord.id.in_(file_ids))
+    )
+    session.commit()
+    return result.rowcount
+
+
+# -----------------------------
+# Retention jobs
+# -----------------------------
+def purge_expired_media(
+    client: Minio,
+    retention_days: int = RETENTION_DAYS,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    pause_seconds: float = RETENTION_BATCH_PAUSE_SECONDS,
+) -> int:
+    """
+    Deletes finished media older than the retention window together
+    with its stored objects. Works in bounded batches with a pause in
+    between so a large backlog does not spike DB or storage load.
+    """
+    if retention_days <= 0:
+        return 0
+
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    purged = 0
+
+    while True:
+        with Session(engine) as session:
+            statement = (
+                select(MediaRecord.id, MediaRecord.s3_key)
+                .where(MediaRecord.created_at < cutoff)
+                .where(MediaRecord.status.not_in(["QUEUED", "PROCESSING"]))
+                .order_by(MediaRecord.created_at)
+                .limit(batch_size)
+            )
+            rows = session.exec(statement).all()
+
+            if not rows:
+                break
+
+            failed = set(remove_objects(client, [s3_key for _, s3_key in rows]))
+
+            # Keep rows whose object could not be removed so the next run retries
+            file_ids = [file_id for file_id, s3_key in rows if s3_key not in failed]
+            purged += delete_records(session, file_ids)
+
+        if len(rows) < batch_size or not file_ids:
+            break
+
+        time.sleep(pause_seconds)
+
+    if purged:
+        print(f"Retention purged {purged} expired media records")
+
+    return purged
+
+
+def purge_orphaned_temp_dirs(
+    max_age_hours: int = TEMP_DIR_MAX_AGE_HOURS,
+    batch_size: int = RETENTION_BATCH_SIZE,
+) -> int:
+    """
+    Removes /tmp/media_* directories left behind by failed runs.
+    Only directories untouched for max_age_hours are removed, so
+    jobs still in flight keep their files.
+    """
+    cutoff = time.time() - max_age_hours * 3600
+    temp_root = tempfile.gettempdir()
+    removed = 0
+
+    with os.scandir(temp_root) as entries:
+        for entry in entries:
+            if removed >= batch_size:
+                break
+
+            if not entry.name.startswith(TEMP_DIR_PREFIX):
+                continue
+
+            try:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if entry.stat(follow_symlinks=False).st_mtime > cutoff:
+                    continue
+
+                shutil.rmtree(entry.path)
+                removed += 1
+            except OSError as err:
+                print(f"Failed to remove temp dir {entry.path}: {err}")
+
+    if removed:
+        print(f"Retention removed {removed} orphaned temp directories")
+
+    return removed
+
+
+async def run_retention_loop(client: Minio) -> None:
+    """Runs the retention jobs periodically, off the event loop."""
+    while True:
+        try:
+            await asyncio.to_thread(purge_orphaned_temp_dirs)
+            await asyncio.to_thread(purge_expired_media, client)
+        except Exception as err:
+            print(f"Retention run failed: {err}")
+
+        await asyncio.sleep(RETENTION_INTERVAL_SECONDS)
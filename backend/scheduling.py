@@ -0,0 +1,117 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# -----------------------------
+# Ingest quota (token bucket)
+# -----------------------------
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills
+    at `rate` tokens per second.
+    """
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.rate,
+        )
+        self.updated_at = now
+
+    def try_acquire(self, amount: float = 1) -> float:
+        """
+        Takes `amount` tokens if available and returns 0.
+        Otherwise takes nothing and returns the seconds to wait.
+        """
+        self._refill()
+
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+
+        if self.rate <= 0:
+            return float("inf")
+        return (amount - self.tokens) / self.rate
+
+
+class OwnerRateLimiter:
+    """One token bucket per owner."""
+
+    def __init__(self, capacity: float, rate_per_minute: float):
+        self.capacity = capacity
+        self.rate = rate_per_minute / 60
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def try_acquire(self, owner_id: str, amount: float = 1) -> float:
+        bucket = self.buckets.get(owner_id)
+        if bucket is None:
+            bucket = self.buckets[owner_id] = TokenBucket(self.capacity, self.rate)
+        return bucket.try_acquire(amount)
+
+
+# -----------------------------
+# Fair dispatch (round-robin)
+# -----------------------------
+def plan_dispatch(
+    queued: Dict[str, Sequence[str]],
+    active: Dict[str, int],
+    per_owner_limit: int,
+    slots: int,
+    last_owner: Optional[str] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Picks the jobs to release next, one per owner per round.
+
+    `queued` maps owner -> job ids, oldest first, and `active` maps
+    owner -> jobs already running. At most `slots` jobs are released in
+    total. Rounds start after `last_owner`, so when `slots` is the
+    bottleneck the owners that were skipped last time go first.
+
+    No owner goes above `per_owner_limit` while others still have jobs
+    to release. Slots that would otherwise sit idle are then shared,
+    round-robin, among the owners that hit the limit; an owner arriving
+    later waits for the next free slot instead of getting a reserved one.
+    """
+    owners = sorted(owner for owner, jobs in queued.items() if jobs)
+    if not owners or slots <= 0:
+        return []
+
+    if last_owner is not None:
+        start = next(
+            (i for i, owner in enumerate(owners) if owner > last_owner), 0
+        )
+        owners = owners[start:] + owners[:start]
+
+    taken = {owner: 0 for owner in owners}
+    plan: List[Tuple[str, str]] = []
+
+    for limited in (True, False):
+        while slots > 0:
+            progressed = False
+
+            for owner in owners:
+                if slots <= 0:
+                    break
+
+                jobs = queued[owner]
+                if taken[owner] >= len(jobs):
+                    continue
+                if limited and active.get(owner, 0) + taken[owner] >= per_owner_limit:
+                    continue
+
+                plan.append((owner, jobs[taken[owner]]))
+                taken[owner] += 1
+                slots -= 1
+                progressed = True
+
+            if not progressed:
+                break
+
+    return plan
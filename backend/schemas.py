@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 
@@ -30,3 +30,35 @@ class MediaDetails(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# -----------------------------
+# Bulk delete
+# -----------------------------
+class BulkDeleteRequest(BaseModel):
+    # One multi-object delete per request (MAX_KEYS_PER_DELETE)
+    ids: list[str] = Field(max_length=1000)
+
+
+class BulkDeleteResult(BaseModel):
+    deleted: int
+    not_found: list[str]
+    storage_errors: list[str]  # ids kept because their object could not be removed
+
+
+# -----------------------------
+# Live transcript segments
+# -----------------------------
+class TranscriptSegmentItem(BaseModel):
+    seq: int
+    start: float
+    end: float
+    text: str
+
+
+class TranscriptSegmentsPage(BaseModel):
+    file_id: str
+    status: str
+    segments: list[TranscriptSegmentItem]
+    next_cursor: int
+    done: bool  # no more segments will arrive; fetch /results for the full text
@@ -0,0 +1,102 @@
+import time
+from typing import List
+
+from sqlmodel import Session, delete, select
+
+from database import engine
+from models import TranscriptSegment
+
+
+def format_segment(segment: dict) -> str:
+    """One transcript line, as stored in MediaRecord transcripts."""
+    return (
+        f"[{segment['start']:7.2f} → {segment['end']:7.2f}] "
+        f"{segment['text']}\n"
+    )
+
+
+# -----------------------------
+# Segment store
+# -----------------------------
+def load_segments(file_id: str, since: int = 0, limit: int = 1000) -> List[dict]:
+    with Session(engine) as session:
+        rows = session.exec(
+            select(TranscriptSegment)
+            .where(TranscriptSegment.file_id == file_id)
+            .where(TranscriptSegment.seq >= since)
+            .order_by(TranscriptSegment.seq)
+            .limit(limit)
+        ).all()
+
+    return [
+        {
+            "seq": row.seq,
+            "start": row.start_time,
+            "end": row.end_time,
+            "text": row.text,
+        }
+        for row in rows
+    ]
+
+
+def delete_segments(session: Session, file_ids: List[str], since: int = 0) -> None:
+    """Deletes segments (from `since` on) without committing."""
+    session.exec(
+        delete(TranscriptSegment)
+        .where(TranscriptSegment.file_id.in_(file_ids))
+        .where(TranscriptSegment.seq >= since)
+    )
+
+
+class SegmentBuffer:
+    """
+    Collects segments as they are transcribed and writes them to the
+    segment store in batches: once `flush_size` segments are pending,
+    or `flush_interval` seconds after the previous flush.
+    """
+
+    def __init__(self, file_id: str, next_seq: int, flush_size: int, flush_interval: float):
+        self.file_id = file_id
+        self.next_seq = next_seq
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.pending: List[dict] = []
+        self.flushed_at = time.monotonic()
+
+    def add(self, segment: dict) -> None:
+        self.pending.append({
+            "seq": self.next_seq,
+            "start": segment["start"],
+            "end": segment["end"],
+            "text": segment["text"],
+        })
+        self.next_seq += 1
+
+    def should_flush(self) -> bool:
+        if not self.pending:
+            return False
+        return (
+            len(self.pending) >= self.flush_size
+            or time.monotonic() - self.flushed_at >= self.flush_interval
+        )
+
+    def flush(self) -> List[dict]:
+        """Writes pending segments in one transaction and returns them."""
+        batch, self.pending = self.pending, []
+        self.flushed_at = time.monotonic()
+
+        if batch:
+            with Session(engine) as session:
+                session.add_all(
+                    TranscriptSegment(
+                        file_id=self.file_id,
+                        seq=segment["seq"],
+                        start_time=segment["start"],
+                        end_time=segment["end"],
+                        text=segment["text"],
+                    )
+                    for segment in batch
+                )
+                session.commit()
+
+        return batch
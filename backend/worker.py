@@ -1,17 +1,30 @@
 import asyncio
+import multiprocessing
+import os
+import sys
+from multiprocessing.connection import wait
+import torch
 from temporalio.client import Client
 from temporalio.worker import Worker
 
 # Import our workflow and activities
 from workflow import MediaProcessingWorkflow
-from activities import MediaActivities, get_whisper_model
+from activities import MediaActivities, get_whisper_model, storage_client
+from retention import run_retention_loop
+from model_store import prepare_whisper_weights
 from config import (
     TEMPORAL_ENDPOINT,
     TEMPORAL_NAMESPACE,
     MEDIA_TASK_QUEUE,
+    TRANSCRIBE_TASK_QUEUE,
+    TRANSCRIBE_CONCURRENCY,
+    WHISPER_MODEL,
+    WHISPER_MMAP_WEIGHTS,
+    WHISPER_WEIGHTS_DIR,
+    WORKER_PROCESSES,
 )
 
-async def main():
+async def main(run_retention: bool = True):
     
     get_whisper_model()
     
@@ -22,7 +35,7 @@ async def main():
 
 
     # 2. Initialize the Activities class
-    activities = MediaActivities()
+    activities = MediaActivities(client)
 
     # 3. Create the Worker
     # It will listen to the "media-task-queue"
@@ -33,18 +46,71 @@ async def main():
         activities=[
             activities.download_from_minio,
             activities.preprocess_audio,
-            activities.transcribe_audio,
+            activities.transcribe_audio,  # still scheduled here by older workflows
             activities.summarize_transcript,
             activities.update_db_status,
             activities.mark_failed,  
         ],
     )
 
+    # Transcriptions get their own queue: this process only polls it while
+    # it has a free slot, so jobs wait in Temporal for any idle process
+    transcribe_worker = Worker(
+        client,
+        task_queue=TRANSCRIBE_TASK_QUEUE,
+        activities=[activities.transcribe_audio],
+        max_concurrent_activities=TRANSCRIBE_CONCURRENCY,
+    )
+
 
     print("🚀 DurableAI Workers are running and listening for tasks...")
-    
-    # Keep the worker running
-    await worker.run()
+
+    # Purge expired media and orphaned temp dirs in the background
+    retention_task = None
+    if run_retention:
+        retention_task = asyncio.create_task(run_retention_loop(storage_client))
+
+    # Keep the workers running
+    try:
+        await asyncio.gather(worker.run(), transcribe_worker.run())
+    finally:
+        if retention_task:
+            retention_task.cancel()
+
+def run_process(run_retention: bool, threads: int) -> None:
+    # Split the cores between processes instead of oversubscribing them
+    torch.set_num_threads(threads)
+    asyncio.run(main(run_retention))
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if WORKER_PROCESSES > 1:
+        if WHISPER_MMAP_WEIGHTS:
+            # Convert once up front so the processes don't race to do it
+            prepare_whisper_weights(WHISPER_MODEL, WHISPER_WEIGHTS_DIR)
+
+        threads = max(1, (os.cpu_count() or 1) // WORKER_PROCESSES)
+        ctx = multiprocessing.get_context("spawn")
+        processes = [
+            ctx.Process(target=run_process, args=(index == 0, threads))
+            for index in range(WORKER_PROCESSES)
+        ]
+
+        for process in processes:
+            process.start()
+
+        # If any process dies, stop the rest and exit non-zero so the
+        # container restarts with full capacity (and retention running)
+        sentinels = {process.sentinel: process for process in processes}
+        for sentinel in wait(list(sentinels)):
+            process = sentinels[sentinel]
+            process.join()
+            print(f"❌ Worker process {process.pid} exited with code {process.exitcode}")
+
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        sys.exit(1)
+    else:
+        asyncio.run(main())
\ No newline at end of file
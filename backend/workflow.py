@@ -1,11 +1,13 @@
 from datetime import timedelta
 from temporalio import workflow
 from temporalio.common import RetryPolicy
-from typing import Dict
+from temporalio.exceptions import ApplicationError
+from typing import Dict, List
 
 # Safe import of activities for Temporal replay
 with workflow.unsafe.imports_passed_through():
     from activities import MediaActivities
+    from config import MEDIA_TASK_QUEUE, TRANSCRIBE_TASK_QUEUE
 
 
 @workflow.defn
@@ -14,6 +16,7 @@ class MediaProcessingWorkflow:
         # Durable, queryable workflow state
         self.progress: str = "STARTING"
         self.cancel_requested: bool = False
+        self.segments: Dict[int, dict] = {}  # by seq
 
     # -----------------------------
     # Workflow entrypoint
@@ -53,10 +56,21 @@ class MediaProcessingWorkflow:
             self.progress = "TRANSCRIBING"
             self._check_cancelled()
 
+            # Workers take transcriptions from their own queue only when they
+            # have a free slot, so waiting happens before the activity starts
+            transcribe_queue = (
+                TRANSCRIBE_TASK_QUEUE
+                if workflow.patched("transcribe-task-queue")
+                else MEDIA_TASK_QUEUE
+            )
+
             transcripts = await workflow.execute_activity(
                 MediaActivities.transcribe_audio,
-                paths,
-                start_to_close_timeout=timedelta(minutes=20),
+                {**paths, "file_id": file_id},
+                task_queue=transcribe_queue,
+                # Multi-hour recordings on CPU; hangs are caught by the heartbeat timeout
+                start_to_close_timeout=timedelta(hours=12),
+                heartbeat_timeout=timedelta(minutes=5),
                 retry_policy=retry_policy,
             )
 
@@ -112,6 +126,10 @@ class MediaProcessingWorkflow:
     def get_progress(self) -> str:
         return self.progress
 
+    @workflow.query
+    def get_segments(self, since: int = 0) -> List[dict]:
+        return [self.segments[seq] for seq in sorted(self.segments) if seq >= since]
+
     # -----------------------------
     # Workflow signal (external control)
     # -----------------------------
@@ -119,9 +137,18 @@ class MediaProcessingWorkflow:
     def cancel(self) -> None:
         self.cancel_requested = True
 
+    @workflow.signal
+    def segments_flushed(self, segments: List[dict]) -> None:
+        # Batches may be resent or arrive after a lost one; keep each seq once
+        for segment in segments:
+            self.segments.setdefault(segment["seq"], segment)
+
     # -----------------------------
     # Internal helpers
     # -----------------------------
     def _check_cancelled(self) -> None:
         if self.cancel_requested:
-            raise workflow.CancelledError("Workflow cancelled by user")
\ No newline at end of file
+            raise ApplicationError(
+                "Workflow cancelled by user",
+                non_retryable=True,
+            )
\ No newline at end of file
@@ -218,6 +218,12 @@ export const HistoryPage = () => {
                   </div>
 
                   {/* Status hints */}
+                  {details.status === "QUEUED" && (
+                    <div className="text-yellow-400 text-sm">
+                      Waiting in queue…
+                    </div>
+                  )}
+
                   {details.status === "PROCESSING" && (
                     <div className="text-yellow-400 text-sm">
                       Processing in progress…